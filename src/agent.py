@@ -5,132 +5,402 @@ A simple conversational agent using LangChain with local models.
 This agent can:
 - LangChain framework usage
 - Local LLM integration with Ollama
-- Memory and conversation chains
+- Memory and conversation summaries
 - Agent reasoning patterns
 """
 
 import os
-from typing import List, Dict
+import re
+import json
+import asyncio
+import hashlib
+import shelve
+import weakref
+from collections import deque
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 
-# LangChain imports
-from langchain_ollama import OllamaLLM
-from langchain.prompts import PromptTemplate
-from langchain.schema import BaseOutputParser
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+# LangChain is imported where it is used: it pulls in hundreds of modules,
+# which is wasted start-up time if the agent exits before it needs them.
+if TYPE_CHECKING:
+    import numpy as np
+    from ollama import AsyncClient, Client
+    from langchain_ollama import OllamaLLM
+    from langchain_community.chat_message_histories import ChatMessageHistory
+    from langchain_core.chat_history import BaseChatMessageHistory
 
 # Load environment variables from .env file
 load_dotenv()
 
-class LangChainAgent():
+# Turns that look like they need more than small talk go to the reasoning model
+_REASONING_PATTERN = re.compile(
+    r"\b(why|explain|prove|derive|compare|analy[sz]e|calculate|solve|debug|step[- ]by[- ]step)\b",
+    re.IGNORECASE,
+)
+
+@lru_cache(maxsize=None)
+def _ollama_client(host: Optional[str]) -> "Client":
     """
-    A local AI agent powered by LangChain and Ollama
+    One Ollama client (and so one HTTP connection pool) per host, shared by
+    every agent in the process.
+    """
+    import httpx
+    from ollama import Client
 
-    Features:
-    - Uses LangChain's conversation chains
-    - Local LLM via Ollama (no API keys!)
-    - Built-in memory management
-    - Customizable prompts and personality
+    return Client(host=host, limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300))
+
+# Async clients per event loop and host. Their pooled connections belong to
+# the loop that opened them, so they can't be shared across loops.
+_async_ollama_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _async_ollama_client(host: Optional[str]) -> "AsyncClient":
+    """
+    The async counterpart of `_ollama_client`, shared by every agent
+    running on the current event loop. Must be called from inside it.
+    """
+    import httpx
+    from ollama import AsyncClient
+
+    clients = _async_ollama_clients.setdefault(asyncio.get_running_loop(), {})
+    if host not in clients:
+        clients[host] = AsyncClient(host=host, limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300))
+    return clients[host]
+
+def _share_ollama_clients(llm: "OllamaLLM") -> "OllamaLLM":
+    """
+    Point an OllamaLLM at the shared sync client instead of the one it built.
+    OllamaLLM takes no client argument, so its private attribute is set.
     """
+    llm._client = _ollama_client(llm.base_url)
+    return llm
 
-    def __init__(self, name: str = None, model_name: str = "llama3.2:latest"):
+def _bind_async_client(llm: "OllamaLLM") -> "OllamaLLM":
+    """
+    Point an OllamaLLM at the shared async client of the running event loop.
+    Call right before each async use.
+    """
+    llm._async_client = _async_ollama_client(llm.base_url)
+    return llm
+
+class ResponseCache():
+    """
+    Remembers the agent's replies so repeated questions skip the model.
+
+    Inputs are matched exactly first, then by embedding similarity, so
+    near-duplicates like "hi" and "hello" can share a reply. A reply is only
+    reused in the same context, i.e. after the same previous message, so
+    "yes" or "tell me more" are never answered from another conversation.
+    Entries are persisted with shelve, keyed by the SHA256 of the context
+    and the normalized input.
+    """
+
+    def __init__(self, get_client: Callable[[], "AsyncClient"], embedding_model: str,
+                 path: str = ".agent_cache", threshold: float = 0.95):
         """
-        Initialize the LangChain agent
+        Initialize the cache and load previous entries from disk
 
         Args:
-            name (str): The agent's name (defaults to environment variable)
-            model_name (str): Ollama model to use
+            get_client (Callable[[], AsyncClient]): Returns the Ollama client
+                used to embed inputs on the running event loop
+            embedding_model (str): Ollama embedding model to use
+            path (str): Where the cache is persisted. Replies depend on the
+                model and prompt that produced them, so use one path per
+                model and system prompt.
+            threshold (float): Minimum cosine similarity for a semantic hit
+        """
+        self._get_client = get_client
+        self.embedding_model = embedding_model
+        self.path = path
+        self.threshold = threshold
+
+        # Exact replies by (context, input), embeddings and replies by context
+        self._exact: Dict[tuple, str] = {}
+        self._embeddings: Dict[str, List["np.ndarray"]] = {}
+        self._replies: Dict[str, List[str]] = {}
+        self._matrices: Dict[str, "np.ndarray"] = {}
+        self._semantic = True
+
+        # The embedding of the last lookup, reused when its reply is stored
+        self._last_lookup: Optional[tuple] = None
+
+        with shelve.open(self.path) as db:
+            for context, key, reply, model, embedding in db.values():
+                self._add(context, key, reply, embedding if model == embedding_model else None)
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        return " ".join(prompt.lower().split())
+
+    @staticmethod
+    def _context_id(context: str) -> str:
+        return hashlib.sha256(context.encode()).hexdigest()
+
+    def _add(self, context: str, key: str, reply: str, embedding: Optional["np.ndarray"]):
+        self._exact[context, key] = reply
+
+        if embedding is not None:
+            self._embeddings.setdefault(context, []).append(embedding)
+            self._replies.setdefault(context, []).append(reply)
+            self._matrices.pop(context, None)
+
+    async def _embed(self, text: str) -> Optional["np.ndarray"]:
+        """
+        Embed text as a unit vector, or None if it can't be embedded.
         """
+        import numpy as np
+        from ollama import ResponseError
 
-        # Set up the agent's identity
-        self.name = name or os.getenv("AGENT_NAME", "LangChainAgent")
-        self.version = os.getenv("AGENT_VERSION", "1.1.0")
-        self.model_name = model_name
+        if not self._semantic:
+            return None
 
-        # Set up beautiful console output
-        self.console = Console()
+        try:
+            response = await self._get_client().embed(model=self.embedding_model, input=text)
+        except ResponseError as e:
+            # The embedding model isn't installed, so fall back to exact
+            # matches for good. Other errors only skip this lookup.
+            if e.status_code == 404:
+                self._semantic = False
+            return None
+        except Exception:
+            return None
 
-        # Initialize the local LLM
-        self.console.print("[yellow]🔄 Connecting to local Ollama model...[/yellow]")
+        vector = np.asarray(response["embeddings"][0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
 
-        try:
-            self.llm = OllamaLLM(
-                model=model_name,
-                temperature=0.7,
-                top_p=0.9,
-            )
+    def _match(self, context: str, key: str, embedding: Optional["np.ndarray"]) -> Optional[str]:
+        import numpy as np
 
-            # Test the connection
-            test_response = self.llm.invoke("Hello")
-            self.console.print("[green]✅ Successfully connected to Ollama![/green]")
+        if (context, key) in self._exact:
+            return self._exact[context, key]
 
-        except Exception as e:
-            self.console.print(f"[red]❌ Error connecting to Ollama: {e}[/red]")
-            self.console.print("[yellow]Make sure Ollama is running: 'ollama serve'[/yellow]")
-            raise
-        
-        # Set up conversation memory
-        self.memory = ChatMessageHistory()
+        if embedding is None or context not in self._embeddings:
+            return None
 
-        # Agent's personality and instructions
-        self.prompt_template = PromptTemplate(
-            input_variables=["history", "input"],
-            template= f"""
-            You are {self.name}, a helpful and friendly AI agent running locally.
-
-            Your personality:
-            - Helpful and informative
-            - Curious and engaging  
-            - Honest about your limitations
-            - Encouraging and supportive
-            - You love learning from humans
-
-            Key principles:
-            - Keep responses conversational and natural
-            - Ask follow-up questions when appropriate
-            - Admit when you don't know something
-            - Show genuine interest in what the human shares
-            - Remember you're running locally (no internet access)
-
-            Previous conversation:
-            {{history}}
-
-            Human: {{input}}
-            {self.name}:
-            """
-        )
+        if context not in self._matrices:
+            self._matrices[context] = np.stack(self._embeddings[context])
 
-        # Create the conversation chain
-        self.conversation = RunnableWithMessageHistory(
-            self.prompt_template | self.llm,
-            lambda _: self.memory,
-            input_messages_key="input",
-            history_messages_key="history"
-        )
+        scores = self._matrices[context] @ embedding
+        best = int(np.argmax(scores))
 
-        self._display_startup_message()
+        if scores[best] >= self.threshold:
+            return self._replies[context][best]
+        return None
+
+    async def lookup(self, prompt: str, context: str = "") -> Optional[str]:
+        """
+        Find a cached reply for the prompt. Only the whole prompt is
+        matched, so a message with several questions only hits when the
+        same message was answered before.
+
+        Args:
+            prompt (str): The user's message
+            context (str): The message the user is replying to, if any
+
+        Returns:
+            Optional[str]: The cached reply, or None on a miss
+        """
+        context = self._context_id(context)
+        key = self._normalize(prompt)
+        self._last_lookup = None
+
+        if (context, key) in self._exact:
+            return self._exact[context, key]
+
+        embedding = await self._embed(key)
+        self._last_lookup = (context, key, embedding)
+
+        return self._match(context, key, embedding)
+
+    async def store(self, prompt: str, reply: str, context: str = ""):
+        """
+        Cache the reply to a prompt, in memory and on disk.
+
+        Args:
+            prompt (str): The user's message
+            reply (str): The agent's reply to it
+            context (str): The message the user was replying to, if any
+        """
+        context = self._context_id(context)
+        key = self._normalize(prompt)
+
+        embedding = None
+        if self._last_lookup and self._last_lookup[:2] == (context, key):
+            embedding = self._last_lookup[2]
+        if embedding is None:
+            embedding = await self._embed(key)
+
+        self._add(context, key, reply, embedding)
+
+        with shelve.open(self.path) as db:
+            db[hashlib.sha256(f"{context}\0{key}".encode()).hexdigest()] = (context, key, reply, self.embedding_model, embedding)
+
+class BaseAgent(ABC):
+    """
+    The model-independent part of a conversational agent
+
+    Handles the Perceive -> Think -> Act loop, console output, input and
+    conversation memory. Subclasses only implement how the model is called.
+    """
+
+    memory: "BaseChatMessageHistory"
+
+    _exit_commands = frozenset({"quit", "exit", "bye", "goodbye"})
+    _thinking_message = "🤔 Thinking..."
+
+    # Largest conversation file that is saved or loaded, in bytes
+    _max_history_bytes = 200_000
+
+    # Longer inputs keep only their last `max_input_tokens` tokens.
+    # Subclasses size this to their model's context window.
+    max_input_tokens = 2048
+
+    def __init__(self, name: str, version: str):
+        """
+        Initialize the shared agent state
+
+        Args:
+            name (str): The agent's name
+            version (str): The agent's version
+        """
+
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.history import FileHistory
+
+        # Set up the agent's identity
+        self.name = name
+        self.version = version
+        self._history_path = f".agent_{name}.json"
+
+        # Set up beautiful console output, and line editing with history
+        # recall for the input prompt
+        self.console = Console()
+        self._session = PromptSession(history=FileHistory(".agent_history"))
+
+        # Tokens are counted locally, so oversized input never reaches the
+        # model. cl100k_base is close enough to the local models' tokenizers
+        # for budgeting. tiktoken downloads it on first use, so offline
+        # machines fall back to estimating 4 characters per token.
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            self._encoding = None
+        self._history_tokens = 0
+
+    @abstractmethod
+    def _build_startup_panel(self) -> Panel:
+        """
+        Build the welcome panel shown when the agent starts.
+        """
+
+    def _build_panels(self):
+        """
+        Build the static panels and texts once, so they are not re-created
+        (and their styles re-parsed) on every turn.
+        """
+        self._response_title = f"🤖 {self.name}"
+        self._thinking_text = Text(self._thinking_message, style="dim")
+        self._goodbye_panel = Panel(
+            Text("Goodbye! It was great chatting with you! 👋", style="bold yellow"),
+            border_style="yellow"
+        )
+        self._startup_panel = self._build_startup_panel()
 
     def _display_startup_message(self):
         """
         Display a welcome message when the agent starts.
         """
-        startup_text = Text()
-        startup_text.append(f"🤖 {self.name} v{self.version} (LangChain Powered) 🛡️\n", style="bold green")
-        startup_text.append(f"Model: {self.model_name}\n", style="cyan")
-        startup_text.append("Framework: LangChain + Ollama\n", style="blue")
-        startup_text.append("\n🌟 Features:\n", style="bold yellow")
-        startup_text.append("✅ Local LLM (no internet needed)\n", style="green")
-        startup_text.append("✅ Conversation memory\n", style="green")
-        startup_text.append("✅ No API keys or costs\n", style="green")
-        startup_text.append("✅ Your data stays private\n", style="green")
-        startup_text.append("Type 'quit' or 'exit' to end our conversation.", style="dim")
+        self.console.print(self._startup_panel)
+
+    def _remember(self, role: str, content: str):
+        """
+        Add a message to the conversation memory.
+
+        Args:
+            role (str): One of "system", "user" or "assistant"
+            content (str): The message text
+        """
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+        message_types = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+        self.memory.add_message(message_types[role](content=content))
+        self._history_tokens += self._count_tokens(content)
+
+    def _count_tokens(self, text: str) -> int:
+        if self._encoding is None:
+            return len(text) // 4
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def _keep_last_tokens(self, text: str, count: int) -> str:
+        if self._encoding is None:
+            return text[-count * 4:]
+        return self._encoding.decode(self._encoding.encode(text, disallowed_special=())[-count:])
+
+    def _recount_history_tokens(self):
+        """
+        Recount the tokens in memory after it was replaced rather than
+        appended to.
+        """
+        self._history_tokens = sum(self._count_tokens(message.content) for message in self.memory.messages)
+
+    def _load_history(self):
+        """
+        Restore the conversation saved by a previous run, if there is one.
+        """
+        from langchain_core.messages import messages_from_dict
+
+        try:
+            if os.path.getsize(self._history_path) > self._max_history_bytes:
+                return
+            with open(self._history_path, encoding="utf-8") as f:
+                messages = messages_from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                self.console.print(f"[yellow]Could not load the previous conversation: {e}[/yellow]")
+            return
+
+        self.memory.add_messages(messages)
+
+    def _save_history(self):
+        """
+        Save the conversation so the next run can pick it up. If it would
+        not fit in `_max_history_bytes`, the oldest exchanges are dropped;
+        a leading summary message is always kept.
+        """
+        from langchain_core.messages import messages_to_dict
 
-        self.console.print(Panel(startup_text, title="🦜⛓️ LangChain Agent Ready", border_style="green"))
+        messages = messages_to_dict(self.memory.messages)
+        head = 1 if messages and messages[0]["type"] == "system" else 0
+
+        # Size of the JSON list: brackets plus each item and its ", "
+        sizes = [len(json.dumps(message)) + 2 for message in messages]
+        total = sum(sizes)
+
+        # Never start the saved turns with a reply, then drop whole exchanges
+        start = head
+        if start < len(messages) and messages[start]["type"] != "human":
+            total -= sizes[start]
+            start += 1
+        while total > self._max_history_bytes and start < len(messages):
+            total -= sum(sizes[start:start + 2])
+            start += 2
+
+        data = json.dumps(messages[:head] + messages[start:])
+
+        try:
+            with open(self._history_path, "w", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            self.console.print(f"[yellow]Could not save the conversation: {e}[/yellow]")
 
     def perceive(self, user_input: str) -> str:
         """
@@ -151,97 +421,447 @@ class LangChainAgent():
         if not processed_input:
             return ""
 
+        tokens = self._count_tokens(processed_input)
+
+        if tokens > self.max_input_tokens:
+            self.console.print(
+                f"[yellow]That message is about {tokens} tokens long, "
+                f"so only its last {self.max_input_tokens} will be used.[/yellow]"
+            )
+            processed_input = self._keep_last_tokens(processed_input, self.max_input_tokens).strip()
+
         return processed_input
-    
-    def think(self, user_input: str) -> str:
+
+    @abstractmethod
+    def think(self, user_input: str) -> AsyncIterator[str]:
         """
         The agent's cognitive process - this is where the AI reasoning happens.
 
-        Uses OpenAI's GPT model to process the input and generate a thoughtful response.
-
         Args:
             user_input (str): The user's message
 
-        Returns:
-            str: The agent's generated response
+        Yields:
+            str: Pieces of the agent's generated response
         """
-        try:
-            # LangChain handles the thinking process
-            response = self.conversation.predict(input=user_input)
 
-            response = response.strip()
+    async def _compact_history(self):
+        """
+        Shrink the conversation memory. Runs in the background while the
+        user is typing; agents without a bounded memory leave it as is.
+        """
 
-            return response
-        
-        except Exception as e:
-            self.console.print(f"I encountered an error while thinking: {str(e)} [/red]")
-            return "I'm having trouble processing that right now. Could you try rephrasing?"
-        
-    def act(self, response: str):
+    async def act(self, response: AsyncIterator[str]):
         """
         The agent's action system - how it communicates back to the user.
 
+        Renders the response panel live, updating it as each piece arrives.
+
         Args:
-            response (str): The message to display to the user
+            response (AsyncIterator[str]): The streamed message to display to the user
         """
 
-        # Create a beautiful response panel
-        response_text = Text(response)
-        self.console.print(Panel(
+        # Create a beautiful response panel. Pieces are appended to one Text
+        # that Live redraws on its own refresh tick.
+        response_text = Text()
+        response_panel = Panel(
             response_text,
-            title=f"🤖 {self.name}",
+            title=self._response_title,
             border_style="blue",
             padding=(1,2)
-        ))
+        )
 
-    def chat(self):
+        with Live(response_panel, console=self.console, refresh_per_second=20):
+            async for piece in response:
+                response_text.append(piece if response_text else piece.lstrip())
+            response_text.rstrip()
+
+    async def chat(self):
         """
         Main conversation loop - this brings everything together
 
         This method orchestrates the full agent cycle:
         Perceive -> Think -> Act -> Repeat
         """
+        from prompt_toolkit.patch_stdout import patch_stdout
+
         try:
             while True:
-                # Get user input
+                # Get user input, summarizing old turns in the background while
+                # the user types. Anything printed meanwhile goes above the prompt.
                 self.console.print() # Spacing
-                user_input = input("👤 You: ")
+                with patch_stdout(raw=True):
+                    compaction = asyncio.create_task(self._compact_history())
+                    user_input = await self._session.prompt_async("👤 You: ")
+                    await compaction
 
-                # Check for exit commands
-                if user_input.lower() in ['quit', 'exit', 'bye', 'goodbye']:
-                    goodbye_text = Text()
-                    goodbye_text.append(f"Goodbye! It was great chatting with you! 👋", style="bold yellow")
-                    self.console.print(Panel(goodbye_text, border_style="yellow"))
-                    break
-                
                 # Agent perceives the input
                 processed_input = self.perceive(user_input)
 
+                # Check for exit commands. No command is longer than 8
+                # characters, so there is no need to lowercase a whole paste.
+                if processed_input[:8].lower() in self._exit_commands:
+                    self.console.print(self._goodbye_panel)
+                    break
+
                 if not processed_input:
                     self.console.print("[yellow]I didn't catch that. Could you say something?[/yellow]")
                     continue
                 
                 # Agent thinks and generates response
-                self.console.print("[dim]🤔 Thinking with LangChain...[/dim]")
+                self.console.print(self._thinking_text)
                 response = self.think(processed_input)
 
                 # Agent responds
-                self.act(response)
+                await self.act(response)
 
-        except KeyboardInterrupt:
-            # Handle Ctrl+C gracefully
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+            # Handle Ctrl+C / Ctrl+D gracefully
             self.console.print("\n[yellow]Chat interrupted. Goodbye! 👋[/yellow]")
         except Exception as e:
-            self.console.print(f"\n[red]And unexpected error occurred: {str(e)}[/red]")
+            self.console.print(f"\n[red]An unexpected error occurred: {str(e)}[/red]")
+        finally:
+            self._save_history()
 
-    def get_memory(self, _):
+    def get_memory(self) -> str:
         """
         Get a summary of the conversation from memory.
         """
-        if hasattr(self.memory, 'buffer'):
-            return self.memory
+        from langchain_core.messages import get_buffer_string
+
+        if self.memory.messages:
+            return get_buffer_string(self.memory.messages, ai_prefix=self.name)
         return "No conversation history yet."
 
+class LangChainAgent(BaseAgent):
+    """
+    A local AI agent powered by LangChain and Ollama
+
+    Features:
+    - Uses LangChain's Ollama integration
+    - Local LLM via Ollama (no API keys!)
+    - Built-in memory management
+    - Customizable prompts and personality
+    """
+
+    llm: "OllamaLLM"
+    reasoning_llm: Optional["OllamaLLM"]
+    memory: "ChatMessageHistory"
+
+    _thinking_message = "🤔 Thinking with LangChain..."
+
+    def __init__(self, name: str = None, model_name: str = None, reasoning_model_name: str = None):
+        """
+        Initialize the LangChain agent
+
+        Args:
+            name (str): The agent's name (defaults to environment variable)
+            model_name (str): Ollama model to use (defaults to environment variable)
+            reasoning_model_name (str): Optional larger Ollama model for turns
+                that need deeper reasoning (defaults to environment variable)
+        """
+
+        from langchain_ollama import OllamaLLM
+        from langchain_community.chat_message_histories import ChatMessageHistory
+
+        super().__init__(
+            name=name or os.getenv("AGENT_NAME", "LangChainAgent"),
+            version=os.getenv("AGENT_VERSION", "1.1.0"),
+        )
+        self.model_name = model_name or os.getenv("OLLAMA_MODEL", "llama3.2:latest")
+        self.reasoning_model_name = reasoning_model_name or os.getenv("OLLAMA_REASONING_MODEL")
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+        # Every request uses the same context window: Ollama reloads the model
+        # when it changes, and silently cuts the start of prompts that don't
+        # fit, which would drop the system prompt.
+        self.num_ctx = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+        self.num_predict = 500
+
+        # Initialize the local LLM
+        self.console.print("[yellow]🔄 Connecting to local Ollama model...[/yellow]")
+
+        try:
+            llm_options = dict(
+                temperature=0.7,
+                num_ctx=self.num_ctx,
+                num_predict=self.num_predict,
+                keep_alive=self.keep_alive,
+            )
+            self.llm = _share_ollama_clients(OllamaLLM(model=self.model_name, **llm_options))
+
+            # Test the connection. A request without a prompt only loads the
+            # model into memory, so no tokens are generated.
+            self._ollama = _ollama_client(self.llm.base_url)
+            self._ollama.generate(
+                model=self.model_name,
+                options={"num_ctx": self.num_ctx},
+                keep_alive=self.keep_alive,
+            )
+            self.console.print("[green]✅ Successfully connected to Ollama![/green]")
+
+        except Exception as e:
+            self.console.print(f"[red]❌ Error connecting to Ollama: {e}[/red]")
+            self.console.print("[yellow]Make sure Ollama is running: 'ollama serve'[/yellow]")
+            raise
+        
+        # Agent's personality and instructions. Built once so the prompt
+        # prefix is byte-for-byte identical on every turn, which lets Ollama
+        # reuse its cached prefix instead of re-processing it.
+        self.system_prompt = (
+            f"You are {self.name}, a helpful and friendly AI agent running locally.\n"
+            "\n"
+            "Your personality:\n"
+            "- Helpful and informative\n"
+            "- Curious and engaging\n"
+            "- Honest about your limitations\n"
+            "- Encouraging and supportive\n"
+            "- You love learning from humans\n"
+            "\n"
+            "Key principles:\n"
+            "- Keep responses conversational and natural\n"
+            "- Ask follow-up questions when appropriate\n"
+            "- Admit when you don't know something\n"
+            "- Show genuine interest in what the human shares\n"
+            "- Remember you're running locally (no internet access)"
+        )
+
+        # Set up conversation memory. Only the last `max_turns` exchanges are
+        # kept verbatim; older ones are folded into a running summary so the
+        # prompt stops growing with every turn.
+        self.memory = ChatMessageHistory()
+        self.max_turns = 8
+        self.summary = ""
+
+        # Split the context window: input gets up to half, the reply its
+        # num_predict, and history (including the summary) what remains
+        # after the system prompt
+        self.max_input_tokens = self.num_ctx // 2
+        self.max_history_tokens = (
+            self.num_ctx - self.max_input_tokens - self.num_predict - self._count_tokens(self.system_prompt)
+        )
+
+        # The prompt is assembled from pre-rendered pieces: the system prompt
+        # and summary as one string, rebuilt only when the summary changes,
+        # and one line per message, rendered once when it is remembered.
+        # The deque also caps the prompt if summarizing keeps failing.
+        self._prompt_prefix = ""
+        self._rendered_messages: deque = deque(maxlen=4 * self.max_turns)
+        self._load_history()
+        self._rebuild_prompt_cache()
+
+        # Small talk stays on the default model; _llm_choice() switches
+        # single turns to the reasoning model when one is configured.
+        # The prompt is rendered by _render_prompt() and memory is written
+        # by _remember(), so the models are called directly without any
+        # chain in between.
+        self.reasoning_llm = None
+        if self.reasoning_model_name:
+            self.reasoning_llm = _share_ollama_clients(OllamaLLM(model=self.reasoning_model_name, **llm_options))
+
+        # Replies to past inputs, so repeated questions skip the model. Each
+        # model and persona gets its own cache file, so a reply is only
+        # replayed for the model that wrote it.
+        self.caches: Dict[str, ResponseCache] = {}
+        for model in {self.model_name, self.reasoning_model_name} - {None}:
+            cache_id = hashlib.sha256(f"{model}\0{self.system_prompt}".encode()).hexdigest()
+            self.caches[model] = ResponseCache(
+                lambda: _async_ollama_client(self.llm.base_url),
+                embedding_model=os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text"),
+                path=f".agent_cache-{cache_id[:16]}",
+            )
+
+        self._prefill_prompt_cache()
+        self._build_panels()
+        self._display_startup_message()
+
+    def _load_history(self):
+        """
+        Restore the previous conversation, including its running summary.
+        """
+        super()._load_history()
+
+        messages = self.memory.messages
+        if messages and messages[0].type == "system":
+            self.summary = messages[0].content.removeprefix("Summary so far: ")
+
+    def _render_message(self, message) -> str:
+        speaker = {"human": "Human", "ai": self.name}.get(message.type, "System")
+        return f"{speaker}: {message.content}"
+
+    def _rebuild_prompt_cache(self):
+        """
+        Re-render the prompt prefix and message lines from memory. Only
+        needed when memory is replaced rather than appended to.
+        """
+        self._prompt_prefix = f"System: {self.system_prompt}"
+        if self.summary:
+            self._prompt_prefix += f"\nSystem: Summary so far: {self.summary}"
+
+        turns = [message for message in self.memory.messages if message.type != "system"]
+        self._rendered_messages.clear()
+        self._rendered_messages.extend(self._render_message(message) for message in turns)
+        self._recount_history_tokens()
+
+    def _render_prompt(self, user_input: str) -> str:
+        """
+        Build the full prompt: the static prefix leads, history follows,
+        the new input is last.
+        """
+        return "\n".join([
+            self._prompt_prefix,
+            *self._rendered_messages,
+            f"Human: {user_input}",
+            f"{self.name}:",
+        ])
+
+    def _remember(self, role: str, content: str):
+        super()._remember(role, content)
+
+        if role != "system":
+            self._rendered_messages.append(self._render_message(self.memory.messages[-1]))
+
+    def _prefill_prompt_cache(self):
+        """
+        Process the rendered system prompt and any restored conversation
+        once, so Ollama already holds their KV cache when the first real
+        turn arrives.
+        """
+        prefix = self._render_prompt("")
+
+        try:
+            # num_predict=0 means "unlimited" to Ollama, so stop after one token
+            self._ollama.generate(
+                model=self.model_name,
+                prompt=prefix,
+                options={"num_predict": 1, "num_ctx": self.num_ctx},
+                keep_alive=self.keep_alive,
+            )
+        except Exception as e:
+            self.console.print(f"[yellow]Could not prefill the prompt cache: {e}[/yellow]")
+
+    def _build_startup_panel(self) -> Panel:
+        """
+        Build the welcome panel shown when the agent starts.
+        """
+        startup_text = Text()
+        startup_text.append(f"🤖 {self.name} v{self.version} (LangChain Powered) 🛡️\n", style="bold green")
+        startup_text.append(f"Model: {self.model_name}\n", style="cyan")
+        startup_text.append("Framework: LangChain + Ollama\n", style="blue")
+        startup_text.append("\n🌟 Features:\n", style="bold yellow")
+        startup_text.append("✅ Local LLM (no internet needed)\n", style="green")
+        startup_text.append("✅ Conversation memory\n", style="green")
+        startup_text.append("✅ No API keys or costs\n", style="green")
+        startup_text.append("✅ Your data stays private\n", style="green")
+        startup_text.append("Type 'quit' or 'exit' to end our conversation.", style="dim")
+
+        return Panel(startup_text, title="🦜⛓️ LangChain Agent Ready", border_style="green")
+
+    async def think(self, user_input: str) -> AsyncIterator[str]:
+        """
+        The agent's cognitive process - this is where the AI reasoning happens.
+
+        Streams the local model's response so it can be shown as it is generated.
+        The turn is added to memory once the stream closes.
+
+        Args:
+            user_input (str): The user's message
+
+        Yields:
+            str: Pieces of the agent's generated response
+        """
+        try:
+            # Answer repeated questions from the cache of the model that would
+            # answer them, as long as they follow the same message as when
+            # the reply was cached
+            llm = self._llm_choice(user_input)
+            cache = self.caches[llm.model]
+            messages = self.memory.messages
+            context = messages[-1].content if messages else ""
+            cached = await cache.lookup(user_input, context)
+
+            if cached is not None:
+                self._remember("user", user_input)
+                self._remember("assistant", cached)
+                yield cached
+
+            else:
+                # Stream the reply from the model picked for this input
+                reply = ""
+                llm = _bind_async_client(llm)
+                async for chunk in llm.astream(self._render_prompt(user_input)):
+                    reply += chunk
+                    yield chunk
+
+                # Don't keep an empty reply, or it would be replayed from the cache
+                reply = reply.strip()
+                if reply:
+                    self._remember("user", user_input)
+                    self._remember("assistant", reply)
+                    await cache.store(user_input, reply, context)
+
+        except Exception as e:
+            self.console.print(f"[red]I encountered an error while thinking: {str(e)}[/red]")
+            yield "I'm having trouble processing that right now. Could you try rephrasing?"
+
+    def _llm_choice(self, user_input: str) -> "OllamaLLM":
+        """
+        Pick the model for a turn: the reasoning model for long or
+        analytical questions when one is configured, else the default.
+        """
+        if self.reasoning_llm and (len(user_input) > 400 or _REASONING_PATTERN.search(user_input)):
+            return self.reasoning_llm
+        return self.llm
+
+    async def _compact_history(self):
+        """
+        Fold the oldest exchanges into the running summary once the memory
+        holds more than `max_turns` exchanges or more than
+        `max_history_tokens` tokens, until it is back within both.
+        """
+        from langchain_core.messages import get_buffer_string
+
+        while True:
+            messages = self.memory.messages
+            turns = messages[1:] if self.summary else messages
+            too_many_turns = len(turns) > 2 * self.max_turns
+
+            if not too_many_turns and self._history_tokens <= self.max_history_tokens:
+                return
+
+            if not turns:
+                # Only the summary is left and it alone is over budget
+                self.summary = self._keep_last_tokens(self.summary, self.max_history_tokens // 2).strip()
+                self.memory.clear()
+                self._remember("system", f"Summary so far: {self.summary}")
+                self._rebuild_prompt_cache()
+                return
+
+            # Summarize whole exchanges: at least the oldest half of the window
+            # when it is full, and then as many as needed for the rest to fit
+            # next to a summary
+            sizes = [self._count_tokens(message.content) for message in turns]
+            budget = self.max_history_tokens - self.max_history_tokens // 4
+            split = max(len(turns) // 4 * 2, 2) if too_many_turns else 2
+            while split < len(turns) and sum(sizes[split:]) > budget:
+                split += 2
+            oldest, recent = turns[:split], turns[split:]
+
+            try:
+                self.summary = (await _bind_async_client(self.llm).ainvoke(
+                    "Summarize the conversation below in a few sentences. Keep names, "
+                    "facts and anything the human asked to be remembered.\n\n"
+                    f"Summary so far: {self.summary or 'None'}\n\n"
+                    f"Conversation:\n{get_buffer_string(oldest, ai_prefix=self.name)}"
+                )).strip()
+            except Exception as e:
+                self.console.print(f"[yellow]Could not summarize the conversation: {e}[/yellow]")
+                return
+
+            self.memory.clear()
+            self._remember("system", f"Summary so far: {self.summary}")
+            self.memory.add_messages(recent)
+            self._rebuild_prompt_cache()
+
 # Function to create and run the agent
 def main():
     """
@@ -252,14 +872,22 @@ def main():
     console.print("[bold blue]🚀 Starting LangChain Agent...[/bold blue]")
 
     try:
-        # Create the agent (you can change the model here)
-        agent = LangChainAgent(
-            name="LocalBot",
-            model_name="llama3.2" # or "phi" for smaller/faster model
-        )
+        # uvloop's faster event loop handles the many small streamed chunks
+        # with less overhead; fall back to asyncio where it isn't installed
+        try:
+            import uvloop
+            run = uvloop.run
+        except ImportError:
+            run = asyncio.run
+
+        # Create the agent (set OLLAMA_MODEL to change the model,
+        # e.g. "phi" for a smaller/faster one)
+        agent = LangChainAgent(name="LocalBot")
 
-        agent.chat()
+        run(agent.chat())
 
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         console.print(f"[red]Failed to start agent: {str(e)}[/red]")
         console.print("[yellow]Make sure Ollama is running: 'ollama serve'[/yellow]")
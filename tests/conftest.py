@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+import src.agent as agent_module
+from src.agent import LangChainAgent
+
+
+class StubOllamaClient:
+    """
+    Stands in for ollama.Client, so the agent starts without a server.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        return {}
+
+
+class StubEmbedClient:
+    """
+    Stands in for ollama.AsyncClient, embedding known texts to fixed vectors.
+    """
+
+    def __init__(self, vectors, error=None):
+        self.vectors = vectors
+        self.error = error
+        self.calls = []
+
+    async def embed(self, model, input):
+        self.calls.append(input)
+        if self.error:
+            raise self.error
+        return {"embeddings": [self.vectors.get(input, [0.0, 0.0, 1.0])]}
+
+
+class StubLLM:
+    """
+    Stands in for OllamaLLM: streams and returns canned replies.
+    """
+
+    def __init__(self, reply="The human said hello a lot.", model="stub"):
+        self.reply = reply
+        self.model = model
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.reply
+
+    async def astream(self, prompt):
+        self.prompts.append(prompt)
+        for piece in self.reply.split(" "):
+            if piece:
+                yield piece + " "
+
+
+@pytest.fixture
+def make_agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Count tokens with the offline estimate, so tests don't download tiktoken data
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    monkeypatch.delenv("OLLAMA_REASONING_MODEL", raising=False)
+    monkeypatch.setattr(agent_module, "_ollama_client", lambda host: StubOllamaClient())
+    monkeypatch.setattr(agent_module, "_bind_async_client", lambda llm: llm)
+    monkeypatch.setattr(agent_module, "_async_ollama_client", lambda host: StubEmbedClient({}))
+
+    def make(**kwargs):
+        return LangChainAgent(name="TestBot", model_name="stub", **kwargs)
+    return make
+
+
+@pytest.fixture
+def agent(make_agent):
+    return make_agent()
+
+
+@pytest.fixture
+def add_exchanges():
+    def add(agent, count, size=1):
+        for i in range(count):
+            agent._remember("user", f"question {i} " + "x" * size)
+            agent._remember("assistant", f"answer {i} " + "y" * size)
+    return add
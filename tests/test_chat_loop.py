@@ -0,0 +1,42 @@
+import asyncio
+import io
+
+from rich.console import Console
+
+
+def run_chat(agent, inputs):
+    """
+    Run the chat loop on scripted inputs, returning the inputs it answered.
+    """
+    inputs = iter(inputs)
+    answered = []
+
+    async def prompt_async(message):
+        return next(inputs)
+
+    async def act(response):
+        async for piece in response:
+            pass
+
+    async def think(user_input):
+        answered.append(user_input)
+        yield "ok"
+
+    agent.console = Console(file=io.StringIO())
+    agent._session.prompt_async = prompt_async
+    agent.think = think
+    agent.act = act
+    asyncio.run(agent.chat())
+    return answered
+
+
+def test_exit_command_is_matched_after_stripping(agent):
+    assert run_chat(agent, ["hello", "  QUIT  ", "never read"]) == ["hello"]
+
+
+def test_input_that_only_starts_like_a_command_is_answered(agent):
+    assert run_chat(agent, ["quit this", "bye-bye", "Goodbye"]) == ["quit this", "bye-bye"]
+
+
+def test_long_input_is_not_mistaken_for_a_command(agent):
+    assert run_chat(agent, ["exit" + " " * 10 + "now", "exit"]) == ["exit" + " " * 10 + "now"]
@@ -0,0 +1,28 @@
+import asyncio
+
+from tests.conftest import StubLLM
+
+
+def test_compaction_waits_for_the_window_to_fill(agent, add_exchanges):
+    agent.llm = StubLLM()
+    add_exchanges(agent, agent.max_turns)
+
+    asyncio.run(agent._compact_history())
+
+    assert agent.summary == ""
+    assert len(agent.memory.messages) == 2 * agent.max_turns
+
+
+def test_compaction_splits_on_an_exchange_boundary(agent, add_exchanges):
+    agent.llm = StubLLM()
+    add_exchanges(agent, agent.max_turns + 1)
+
+    asyncio.run(agent._compact_history())
+
+    messages = agent.memory.messages
+    assert agent.summary == "The human said hello a lot."
+    assert messages[0].content == "Summary so far: The human said hello a lot."
+    assert messages[1].type == "human"
+    assert len(messages) % 2 == 1
+    assert "question 0" in agent.llm.prompts[0]
+    assert "question 0" not in agent._render_prompt("next")
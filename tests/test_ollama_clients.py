@@ -0,0 +1,39 @@
+import asyncio
+
+from langchain_ollama import OllamaLLM
+
+from src.agent import _async_ollama_client, _bind_async_client, _ollama_client, _share_ollama_clients
+
+
+def test_sync_client_is_shared_per_host():
+    assert _ollama_client("http://localhost:11434") is _ollama_client("http://localhost:11434")
+    assert _ollama_client("http://localhost:11434") is not _ollama_client("http://other:11434")
+
+
+def test_async_client_is_reused_within_one_event_loop():
+    async def clients():
+        return _async_ollama_client(None), _async_ollama_client(None), _async_ollama_client("http://other:11434")
+
+    first, second, other = asyncio.run(clients())
+
+    assert first is second
+    assert first is not other
+
+
+def test_each_event_loop_gets_its_own_async_client():
+    async def client():
+        return _async_ollama_client(None)
+
+    assert asyncio.run(client()) is not asyncio.run(client())
+
+
+def test_llms_are_pointed_at_the_shared_clients():
+    llm = _share_ollama_clients(OllamaLLM(model="stub"))
+
+    async def bind():
+        return _bind_async_client(llm)._async_client, _async_ollama_client(llm.base_url)
+
+    bound, shared = asyncio.run(bind())
+
+    assert llm._client is _ollama_client(llm.base_url)
+    assert bound is shared
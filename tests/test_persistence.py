@@ -0,0 +1,46 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agent import LangChainAgent
+
+
+def test_save_keeps_summary_and_drops_whole_exchanges(agent, monkeypatch, add_exchanges):
+    monkeypatch.setattr(agent, "_max_history_bytes", 2_000)
+    agent._remember("system", "Summary so far: earlier chat")
+    add_exchanges(agent, 10, size=100)
+
+    agent._save_history()
+
+    with open(agent._history_path, encoding="utf-8") as f:
+        data = f.read()
+    saved = json.loads(data)
+
+    assert len(data) <= 2_000
+    assert saved[0]["data"]["content"] == "Summary so far: earlier chat"
+    assert saved[1]["type"] == "human"
+    assert len(saved) % 2 == 1
+    assert saved[-1]["data"]["content"].startswith("answer 9")
+
+
+def test_save_skips_a_leading_reply(agent):
+    agent.memory.add_messages([AIMessage(content="orphan"), HumanMessage(content="hi"), AIMessage(content="hello")])
+
+    agent._save_history()
+
+    with open(agent._history_path, encoding="utf-8") as f:
+        saved = json.load(f)
+
+    assert [message["type"] for message in saved] == ["human", "ai"]
+
+
+def test_history_is_restored_with_its_summary(agent, add_exchanges):
+    agent._remember("system", "Summary so far: earlier chat")
+    add_exchanges(agent, 1)
+    agent._save_history()
+
+    restored = LangChainAgent(name="TestBot", model_name="stub")
+
+    assert restored.summary == "earlier chat"
+    assert len(restored.memory.messages) == 3
+    assert "question 0" in restored._render_prompt("next")
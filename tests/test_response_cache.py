@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from ollama import ResponseError
+
+from src.agent import ResponseCache
+from tests.conftest import StubEmbedClient
+
+
+VECTORS = {
+    "hello": [1.0, 0.0, 0.0],
+    "hello there": [0.99, 0.05, 0.0],
+    "what's your name?": [0.0, 1.0, 0.0],
+}
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(client):
+        return ResponseCache(lambda: client, "stub-embed", path=str(tmp_path / "cache"))
+    return make
+
+
+def test_exact_hit_ignores_case_and_whitespace(make_cache):
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    asyncio.run(cache.store("Hello", "Hi!"))
+
+    assert asyncio.run(cache.lookup("  hello ")) == "Hi!"
+
+
+def test_semantic_hit_above_threshold(make_cache):
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    asyncio.run(cache.store("hello", "Hi!"))
+
+    assert asyncio.run(cache.lookup("hello there")) == "Hi!"
+
+
+def test_semantic_miss_below_threshold(make_cache):
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    asyncio.run(cache.store("hello", "Hi!"))
+
+    assert asyncio.run(cache.lookup("what's your name?")) is None
+
+
+def test_miss_in_a_different_context(make_cache):
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    asyncio.run(cache.store("hello", "Hi!", context="Shall I go on?"))
+
+    assert asyncio.run(cache.lookup("hello", context="Shall I go on?")) == "Hi!"
+    assert asyncio.run(cache.lookup("hello")) is None
+    assert asyncio.run(cache.lookup("hello there", context="Anything else?")) is None
+
+
+def test_multi_part_input_only_matches_as_a_whole(make_cache):
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    asyncio.run(cache.store("hello", "Hi!"))
+    asyncio.run(cache.store("what's your name?", "I'm TestBot."))
+
+    assert asyncio.run(cache.lookup("hello\n\nwhat's your name?")) is None
+
+
+def test_entries_persist_across_instances(make_cache):
+    asyncio.run(make_cache(StubEmbedClient(VECTORS)).store("hello", "Hi!"))
+
+    cache = make_cache(StubEmbedClient(VECTORS))
+
+    assert asyncio.run(cache.lookup("hello")) == "Hi!"
+    assert asyncio.run(cache.lookup("hello there")) == "Hi!"
+
+
+def test_lookup_embedding_is_reused_on_store(make_cache):
+    client = StubEmbedClient(VECTORS)
+    cache = make_cache(client)
+
+    asyncio.run(cache.lookup("hello"))
+    asyncio.run(cache.store("hello", "Hi!"))
+
+    assert client.calls == ["hello"]
+
+
+def test_missing_embedding_model_disables_semantic_matching(make_cache):
+    client = StubEmbedClient(VECTORS, error=ResponseError("model not found", 404))
+    cache = make_cache(client)
+
+    assert asyncio.run(cache.lookup("hello")) is None
+    assert asyncio.run(cache.lookup("hello")) is None
+    assert len(client.calls) == 1
+
+
+def test_transient_embedding_error_only_skips_one_call(make_cache):
+    client = StubEmbedClient(VECTORS, error=TimeoutError())
+    cache = make_cache(client)
+
+    assert asyncio.run(cache.lookup("hello")) is None
+
+    client.error = None
+    asyncio.run(cache.store("hello", "Hi!"))
+
+    assert asyncio.run(cache.lookup("hello there")) == "Hi!"
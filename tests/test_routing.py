@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.fixture
+def routed_agent(make_agent):
+    return make_agent(reasoning_model_name="thinker")
+
+
+@pytest.mark.parametrize("user_input", [
+    "Why is the sky blue?",
+    "Can you explain recursion?",
+    "Solve x + 2 = 5 step by step",
+    "Please debug this function",
+    "a" * 401,
+])
+def test_analytical_or_long_input_goes_to_the_reasoning_model(routed_agent, user_input):
+    assert routed_agent._llm_choice(user_input) is routed_agent.reasoning_llm
+
+
+@pytest.mark.parametrize("user_input", ["hello", "What's your name?", "a" * 400])
+def test_small_talk_stays_on_the_default_model(routed_agent, user_input):
+    assert routed_agent._llm_choice(user_input) is routed_agent.llm
+
+
+def test_everything_uses_the_default_model_without_a_reasoning_model(agent):
+    assert agent.reasoning_llm is None
+    assert agent._llm_choice("Why is the sky blue?") is agent.llm
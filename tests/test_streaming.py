@@ -0,0 +1,31 @@
+import asyncio
+import io
+
+from rich.console import Console
+
+from tests.conftest import StubLLM
+
+
+async def pieces(*texts):
+    for text in texts:
+        yield text
+
+
+def test_think_streams_the_reply_in_pieces(agent):
+    agent.llm = StubLLM(reply="Hi there, friend!")
+
+    async def run():
+        return [piece async for piece in agent.think("hello")]
+    streamed = asyncio.run(run())
+
+    assert streamed == ["Hi ", "there, ", "friend! "]
+    assert [message.content for message in agent.memory.messages] == ["hello", "Hi there, friend!"]
+
+
+def test_act_shows_the_whole_streamed_reply(agent):
+    agent.console = Console(file=io.StringIO(), width=60)
+
+    result = asyncio.run(agent.act(pieces(" Hi ", "there, ", "friend! ")))
+
+    assert result is None
+    assert "Hi there, friend!" in agent.console.file.getvalue()
@@ -0,0 +1,45 @@
+import asyncio
+
+from tests.conftest import StubLLM
+
+
+def collect(agent, user_input):
+    async def run():
+        return [piece async for piece in agent.think(user_input)]
+    return asyncio.run(run())
+
+
+def test_empty_reply_is_not_remembered_or_cached(agent):
+    agent.llm = StubLLM(reply="")
+
+    collect(agent, "hello")
+    agent.llm = StubLLM(reply="Hi there!")
+    pieces = collect(agent, "hello")
+
+    assert agent.llm.prompts
+    assert "".join(pieces).strip() == "Hi there!"
+    assert [message.content for message in agent.memory.messages] == ["hello", "Hi there!"]
+
+
+def test_replies_are_cached_per_answering_model(make_agent):
+    agent = make_agent(reasoning_model_name="thinker")
+    agent.llm = StubLLM(reply="Hi there!")
+    agent.reasoning_llm = StubLLM(reply="Because of the weather.", model="thinker")
+
+    collect(agent, "why is the sky blue?")
+    agent.memory.clear()
+    agent.reasoning_llm = None
+    pieces = collect(agent, "why is the sky blue?")
+
+    assert "".join(pieces).strip() == "Hi there!"
+
+
+def test_cache_hit_skips_the_model_and_remembers_the_turn(agent):
+    agent.llm = StubLLM()
+    asyncio.run(agent.caches["stub"].store("hello", "Hi from the cache!"))
+
+    pieces = collect(agent, "HELLO")
+
+    assert pieces == ["Hi from the cache!"]
+    assert agent.llm.prompts == []
+    assert [message.content for message in agent.memory.messages] == ["HELLO", "Hi from the cache!"]
@@ -0,0 +1,61 @@
+import asyncio
+
+from tests.conftest import StubLLM
+
+
+def test_limits_fit_the_context_window(agent):
+    prompt_tokens = agent._count_tokens(agent.system_prompt)
+
+    assert agent.max_input_tokens == agent.num_ctx // 2
+    assert agent.max_input_tokens + agent.max_history_tokens + agent.num_predict + prompt_tokens == agent.num_ctx
+
+
+def test_warmup_and_prefill_use_the_same_context_window(agent):
+    calls = agent._ollama.calls
+
+    assert calls and all(call["options"]["num_ctx"] == agent.num_ctx for call in calls)
+
+
+def test_perceive_keeps_the_end_of_oversized_input(agent):
+    text = "a" * (agent.max_input_tokens * 4) + "THE END"
+
+    processed = agent.perceive(text)
+
+    assert processed.endswith("THE END")
+    assert agent._count_tokens(processed) <= agent.max_input_tokens
+
+
+def test_perceive_leaves_short_input_alone(agent):
+    assert agent.perceive("  hello  ") == "hello"
+
+
+def test_compaction_triggers_on_token_budget(agent, add_exchanges):
+    agent.llm = StubLLM()
+    add_exchanges(agent, 1, size=agent.max_history_tokens * 4)
+    add_exchanges(agent, 1)
+
+    asyncio.run(agent._compact_history())
+
+    assert agent.summary
+    assert [message.type for message in agent.memory.messages] == ["system", "human", "ai"]
+
+
+def test_compaction_brings_history_within_budget(agent, add_exchanges):
+    agent.llm = StubLLM()
+    add_exchanges(agent, 3, size=1000)
+    assert agent._history_tokens > agent.max_history_tokens
+
+    asyncio.run(agent._compact_history())
+
+    assert agent._history_tokens <= agent.max_history_tokens
+    assert agent.memory.messages[0].type == "system"
+
+
+def test_compaction_trims_a_summary_that_is_over_budget(agent, add_exchanges):
+    agent.llm = StubLLM(reply="z" * agent.max_history_tokens * 8)
+    add_exchanges(agent, 2, size=agent.max_history_tokens * 4)
+
+    asyncio.run(agent._compact_history())
+
+    assert agent._history_tokens <= agent.max_history_tokens
+    assert [message.type for message in agent.memory.messages] == ["system"]